@@ -17,9 +17,10 @@ This module defines the Task class.
 A Task has a name and a signature that defines the types of its parameters.
 """
 
+import itertools
 import unified_planning as up
 from unified_planning.environment import get_env, Environment
-from typing import List, OrderedDict, Optional, Union
+from typing import OrderedDict, Optional, Sequence, Tuple, Union
 from unified_planning.model.fnode import FNode
 from unified_planning.model.action import Action
 from unified_planning.model.timing import Timepoint, TimepointKind
@@ -32,32 +33,47 @@ from unified_planning.model.timing import TimeInterval
 class Task:
     """Represents an abstract task."""
 
+    __slots__ = ["_env", "_name", "_hash", "_parameters"]
+
     def __init__(
         self,
         name: str,
-        _parameters: Optional[Union[OrderedDict[str, Type], List[Parameter]]] = None,
+        _parameters: Optional[
+            Union[OrderedDict[str, Type], Sequence[Parameter]]
+        ] = None,
         _env: Environment = None,
         **kwargs: Type,
     ):
         self._env = get_env(_env)
         self._name = name
-        self._parameters: List[Parameter] = []
+        self._hash: Optional[int] = None
+        self._parameters: Tuple[Parameter, ...] = ()
         if _parameters is not None:
             assert len(kwargs) == 0
             if isinstance(_parameters, OrderedDict):
-                for param_name, param_type in _parameters.items():
-                    self._parameters.append(
-                        up.model.parameter.Parameter(param_name, param_type, self._env)
-                    )
-            elif isinstance(_parameters, List):
-                self._parameters = _parameters[:]
+                self._parameters = tuple(
+                    up.model.parameter.Parameter(param_name, param_type, self._env)
+                    for param_name, param_type in _parameters.items()
+                )
+            elif isinstance(_parameters, Sequence):
+                self._parameters = tuple(_parameters)
             else:
                 raise NotImplementedError
         else:
-            for param_name, param_type in kwargs.items():
-                self._parameters.append(
-                    up.model.parameter.Parameter(param_name, param_type, self._env)
-                )
+            self._parameters = tuple(
+                up.model.parameter.Parameter(param_name, param_type, self._env)
+                for param_name, param_type in kwargs.items()
+            )
+
+    def __getstate__(self):
+        # Don't pickle _hash: string hashes depend on the per-process hash seed
+        return {k: getattr(self, k) for k in self.__slots__ if k != "_hash"}
+
+    def __setstate__(self, state):
+        for k, v in state.items():
+            setattr(self, k, v)
+        # _hash is recomputed lazily since it doesn't exist in the pickle
+        self._hash = None
 
     def __repr__(self) -> str:
         sign = ""
@@ -67,17 +83,21 @@ class Task:
         return f"{self.name}{sign}"
 
     def __eq__(self, oth: object) -> bool:
+        if self is oth:
+            return True
         if isinstance(oth, Task):
-            return (
-                self._name == oth._name
-                and self._parameters == oth._parameters
-                and self._env == oth._env
-            )
+            if self._name != oth._name or len(self._parameters) != len(
+                oth._parameters
+            ):
+                return False
+            return self._env == oth._env and self._parameters == oth._parameters
         else:
             return False
 
     def __hash__(self) -> int:
-        return hash(self._name) + sum(map(hash, self._parameters))
+        if self._hash is None:
+            self._hash = hash((self._name, self._parameters))
+        return self._hash
 
     @property
     def name(self) -> str:
@@ -85,77 +105,132 @@ class Task:
         return self._name
 
     @property
-    def parameters(self) -> List[Parameter]:
-        """Returns the task's parameters as a list."""
+    def parameters(self) -> Sequence[Parameter]:
+        """Returns the task's parameters."""
         return self._parameters
 
     def __call__(self, *args: Expression, ident: Optional[str] = None) -> "Subtask":
         """Returns a subtask with the given parameters."""
-        return Subtask(self, *self._env.expression_manager.auto_promote(args))
+        return Subtask(
+            self,
+            *self._env.expression_manager.auto_promote(args),
+            ident=ident,
+            _promoted=True,
+        )
 
 
 # global counter to enable the creation of unique identifiers.
-_task_id_counter = 0
+_task_id_counter = itertools.count(1)
 
 
 class Subtask:
+    __slots__ = [
+        "_env",
+        "_task",
+        "_ident",
+        "_args",
+        "_duration_const",
+        "_start_const",
+        "_end_const",
+        "_hash",
+        "_start",
+        "_end",
+        "_repr",
+    ]
+
     def __init__(
         self,
         _task: Union[Action, Task],
         *args: Expression,
         ident: Optional[str] = None,
         _env: Environment = None,
+        _promoted: bool = False,
     ):
         self._env = get_env(_env)
         self._task = _task
-        self._ident: str
-        if ident is not None:
-            self._ident = ident
-        else:
-            # we have to create an unambiguous identifier as there might otherwise identical tasks
-            global _task_id_counter
-            _task_id_counter += 1
-            self._ident = f"_t{_task_id_counter}"
-        self._args = self._env.expression_manager.auto_promote(*args)
+        # we have to create an unambiguous identifier as there might otherwise identical tasks
+        self._ident: str = (
+            ident if ident is not None else f"_t{next(_task_id_counter)}"
+        )
+        # args coming from Task.__call__ have already been promoted to FNode
+        self._args: Tuple["FNode", ...] = (
+            tuple(args)
+            if _promoted
+            else tuple(self._env.expression_manager.auto_promote(*args))
+        )
 
         self._duration_const: "up.model.timing.TimeInterval" = None
         self._start_const: "up.model.timing.TimeInterval" = None
         self._end_const: "up.model.timing.TimeInterval" = None
+        self._hash: Optional[int] = None
+        self._start: Optional[Timepoint] = None
+        self._end: Optional[Timepoint] = None
+        self._repr: Optional[str] = None
         assert len(self._args) == len(self._task.parameters)
 
+    def __getstate__(self):
+        # Don't pickle _hash: string hashes depend on the per-process hash seed
+        return {k: getattr(self, k) for k in self.__slots__ if k != "_hash"}
+
+    def __setstate__(self, state):
+        for k, v in state.items():
+            setattr(self, k, v)
+        # _hash is recomputed lazily since it doesn't exist in the pickle
+        self._hash = None
+
     def __repr__(self):
-        s = []
-        params = ", ".join([str(a) for a in self._args])
-        s.append(f"{self.identifier}: {self._task.name}({params})\n")
-        s.append("        time_constraints = [\n")
-        if self._start_const is not None:
-            s.append(f"          start = {str(self._start_const)}\n")
-        if self._end_const is not None:
-            s.append(f"          end = {str(self._end_const)}\n")
-        if self._duration_const is not None:
-            s.append(f"          duration = {str(self._duration_const)}\n")
-        s.append("        ]")
-        return "".join(s)
+        if self._repr is None:
+            params = ", ".join(map(str, self._args))
+            start = (
+                f"          start = {self._start_const}\n"
+                if self._start_const is not None
+                else ""
+            )
+            end = (
+                f"          end = {self._end_const}\n"
+                if self._end_const is not None
+                else ""
+            )
+            duration = (
+                f"          duration = {self._duration_const}\n"
+                if self._duration_const is not None
+                else ""
+            )
+            # the task name is left out as actions can be renamed (e.g. by compilers)
+            self._repr = (
+                f"({params})\n"
+                f"        time_constraints = [\n"
+                f"{start}{end}{duration}"
+                f"        ]"
+            )
+        return f"{self._ident}: {self._task.name}{self._repr}"
 
     def __eq__(self, other):
+        if self is other:
+            return True
         if not isinstance(other, Subtask):
             return False
+        # identifiers are unique, so comparing them first discards most mismatches
         return (
-            self._env == other._env
-            and self._ident == other._ident
+            self._ident == other._ident
+            and self._env == other._env
             and self._task == other._task
             and self._args == other._args
         )
 
     def __hash__(self):
-        return hash(self._ident) + hash(self._task) + sum(map(hash, self._args))
+        # the task is left out on purpose: the hash of an Action depends on its
+        # conditions and effects, which may still change after the subtask is created
+        if self._hash is None:
+            self._hash = hash((self._ident, self._args))
+        return self._hash
 
     @property
     def task(self) -> Union[Task, Action]:
         return self._task
 
     @property
-    def parameters(self) -> List["FNode"]:
+    def parameters(self) -> Sequence["FNode"]:
         return self._args
 
     @property
@@ -166,12 +241,16 @@ class Subtask:
     @property
     def start(self) -> Timepoint:
         """Timepoint representing the task's start time."""
-        return Timepoint(TimepointKind.START, container=self.identifier)
+        if self._start is None:
+            self._start = Timepoint(TimepointKind.START, container=self.identifier)
+        return self._start
 
     @property
     def end(self) -> Timepoint:
         """Timepoint representing the task's end time."""
-        return Timepoint(TimepointKind.END, container=self.identifier)
+        if self._end is None:
+            self._end = Timepoint(TimepointKind.END, container=self.identifier)
+        return self._end
 
     def set_start_constraint(
         self,
@@ -185,6 +264,7 @@ class Subtask:
         :param less_than: If new constraint is the result of `<` or `<=`.
         """
         # TODO: Make any needed verification
+        self._repr = None
         if self._start_const is not None:
             self._start_const = self._join_time_constraints(
                 self._start_const,
@@ -206,6 +286,7 @@ class Subtask:
         :param less_than: If new constraint is the result of `<` or `<=`.
         """
         # TODO: Make any needed verification
+        self._repr = None
         if self._end_const is not None:
             self._end_const = self._join_time_constraints(
                 self._end_const,
@@ -227,6 +308,7 @@ class Subtask:
         :param less_than: If new constraint is the result of `<` or `<=`.
         """
         # TODO: Make any needed verification
+        self._repr = None
         if self._duration_const is not None:
             self._duration_const = self._join_time_constraints(
                 self._duration_const,
@@ -13,6 +13,8 @@
 # limitations under the License.
 
 
+import collections
+import pickle
 import unified_planning as up
 from unified_planning.shortcuts import *
 from unified_planning.test import TestCase, main, examples
@@ -521,6 +523,95 @@ class TestProblem(TestCase):
 
         self.assertEqual(2, len(problem.task_network.subtasks))
 
+    def test_htn_task_from_parameters(self):
+        Location = UserType("Location")
+        go = up.model.htn.Task("go", to=Location)
+        go_copy = up.model.htn.Task("go", go.parameters)
+        self.assertEqual(go, go_copy)
+        self.assertEqual(hash(go), hash(go_copy))
+        self.assertEqual(str(go), str(go_copy))
+        self.assertEqual(go.parameters, go_copy.parameters)
+        go_list = up.model.htn.Task("go", list(go.parameters))
+        self.assertEqual(go, go_list)
+        self.assertEqual(hash(go), hash(go_list))
+        go_deque = up.model.htn.Task("go", collections.deque(go.parameters))
+        self.assertEqual(go, go_deque)
+
+    def test_htn_pickle_recomputes_hash(self):
+        Location = UserType("Location")
+        l1 = Object("l1", Location)
+        go = up.model.htn.Task("go", to=Location)
+        subtask = go(l1)
+        hash(go), hash(subtask)
+        # simulate hashes cached by a process with a different hash seed
+        go._hash = hash(go) + 1
+        subtask._hash = hash(subtask) + 1
+        go_loaded = pickle.loads(pickle.dumps(go))
+        subtask_loaded = pickle.loads(pickle.dumps(subtask))
+        go_fresh = up.model.htn.Task(
+            "go", go_loaded.parameters, _env=go_loaded._env
+        )
+        self.assertEqual(go_fresh, go_loaded)
+        self.assertEqual(hash(go_fresh), hash(go_loaded))
+        self.assertIn(go_fresh, {go_loaded})
+        subtask_fresh = up.model.htn.Subtask(
+            subtask_loaded.task,
+            *subtask_loaded.parameters,
+            ident=subtask_loaded.identifier,
+            _env=subtask_loaded._env,
+        )
+        self.assertEqual(subtask_fresh, subtask_loaded)
+        self.assertEqual(hash(subtask_fresh), hash(subtask_loaded))
+        self.assertEqual(str(subtask), str(subtask_loaded))
+
+    def test_htn_subtask_hash(self):
+        Location = UserType("Location")
+        l1 = Object("l1", Location)
+        at = Fluent("at", BoolType(), position=Location)
+        move = InstantaneousAction("move", to=Location)
+        subtask = up.model.htn.Subtask(move, l1)
+        h = hash(subtask)
+        move.add_precondition(Not(at(move.parameter("to"))))
+        move.add_effect(at(move.parameter("to")), True)
+        self.assertEqual(h, hash(subtask))
+        self.assertIn(subtask, {subtask})
+
+        go = up.model.htn.Task("go", to=Location)
+        called = go(l1)
+        direct = up.model.htn.Subtask(go, l1, ident=called.identifier)
+        self.assertEqual(called.parameters, direct.parameters)
+        self.assertEqual(called, direct)
+        self.assertEqual(hash(called), hash(direct))
+
+    def test_htn_task_call(self):
+        Location = UserType("Location")
+        l1 = Object("l1", Location)
+        go = up.model.htn.Task("go", to=Location)
+        subtask = go(l1, ident="go_l1")
+        self.assertEqual("go_l1", subtask.identifier)
+        self.assertEqual(go, subtask.task)
+        self.assertEqual((ObjectExp(l1),), tuple(subtask.parameters))
+        self.assertNotEqual(go(l1).identifier, go(l1).identifier)
+
+    def test_htn_subtask_repr(self):
+        a = InstantaneousAction("a")
+        subtask = up.model.htn.Subtask(a, ident="s")
+        self.assertEqual(
+            "s: a()\n        time_constraints = [\n        ]", repr(subtask)
+        )
+        subtask.set_start_constraint(
+            up.model.timing.TimeInterval(Int(1), Int(3)), False
+        )
+        self.assertEqual(
+            "s: a()\n        time_constraints = [\n          start = [1, 3]\n        ]",
+            repr(subtask),
+        )
+        a.name = "b"
+        self.assertEqual(
+            "s: b()\n        time_constraints = [\n          start = [1, 3]\n        ]",
+            repr(subtask),
+        )
+
     def test_simple_numeric_planning_kind(self):
 
         problem = self.problems["robot"].problem